@@ -5,7 +5,7 @@ import typer
 from .spec import PyodideLockSpec
 from .utils import add_wheels_to_spec
 
-main = typer.Typer(help="manipulate pyodide-lock.json lockfiles.")
+main = typer.Typer(help="manipulate pyodide-lock.json lockfiles.", no_args_is_help=True)
 
 
 @main.command()
@@ -47,7 +47,7 @@ def add_wheels(
 
     """
     sp = PyodideLockSpec.from_json(input)
-    add_wheels_to_spec(
+    sp = add_wheels_to_spec(
         sp,
         wheels,
         base_path=base_path,
@@ -1,9 +1,71 @@
 import json
+import sys
+from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
+try:
+    from packaging.utils import (
+        canonicalize_name,
+        canonicalize_version,
+        parse_wheel_filename,
+    )
+except ImportError:  # pragma: no cover
+    # packaging is only needed by check_wheel_filenames (the "wheel" extra)
+    canonicalize_name = canonicalize_version = parse_wheel_filename = None  # type: ignore[assignment]
+
+orjson: ModuleType | None
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if TYPE_CHECKING:
+    from packaging.utils import BuildTag, NormalizedName
+    from packaging.version import Version
+
+
+# Lockfiles repeat the same names, versions and wheel filenames across
+# checks, so the (regex based) packaging helpers are cached.
+@lru_cache(maxsize=4096)
+def _canonicalize_name(name: str) -> str:
+    """Canonicalize a package name, skipping the regex for names that are
+    already canonical (the common case on PyPI). The result is interned, as
+    the same dependency names repeat across many packages.
+
+    Examples
+    --------
+    >>> _canonicalize_name("numpy")
+    'numpy'
+    >>> _canonicalize_name("Foo.Bar__baz")
+    'foo-bar-baz'
+    """
+    if (
+        name.isascii()
+        and name.islower()
+        and "_" not in name
+        and "." not in name
+        and "--" not in name
+    ):
+        return sys.intern(name)
+    return sys.intern(canonicalize_name(name))
+
+
+@lru_cache(maxsize=4096)
+def _canonicalize_version(version: "Version | str") -> str:
+    return canonicalize_version(version)
+
+
+@lru_cache(maxsize=4096)
+def _parse_wheel_filename(
+    filename: str,
+) -> tuple["NormalizedName", "Version", "BuildTag", frozenset]:
+    return parse_wheel_filename(filename)
+
 
 class InfoSpec(BaseModel):
     arch: Literal["wasm32", "wasm64"] = "wasm32"
@@ -41,42 +103,115 @@ class PyodideLockSpec(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     @classmethod
-    def from_json(cls, path: Path) -> "PyodideLockSpec":
-        """Read the lock spec from a json file."""
-        with path.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-        return cls(**data)
-
-    def to_json(self, path: Path, indent: int | None = None) -> None:
-        """Write the lock spec to a json file."""
-        with path.open("w", encoding="utf-8") as fh:
-            model_dict = self.model_dump()
-            json_str = json.dumps(model_dict, indent=indent, sort_keys=True)
-            fh.write(json_str)
+    def from_json(cls, path: Path, *, validate: bool = True) -> "PyodideLockSpec":
+        """Read the lock spec from a json file.
+
+        With ``validate=False`` the models are built with ``model_construct``,
+        skipping validation entirely. Only use this for trusted lockfiles
+        that are known to match the schema, e.g. ones written by ``to_json``.
+        """
+        if validate:
+            return cls.model_validate_json(path.read_bytes())
+
+        loads = orjson.loads if orjson is not None else json.loads
+        data = loads(path.read_bytes())
+        return cls.model_construct(
+            info=InfoSpec.model_construct(**data["info"]),
+            packages={
+                name: PackageSpec.model_construct(**package)
+                for name, package in data["packages"].items()
+            },
+        )
+
+    @classmethod
+    def from_json_streaming(cls, path: Path) -> "PyodideLockSpec":
+        """Read the lock spec from a json file, one package at a time.
+
+        This keeps the peak memory usage low for large lockfiles, as only a
+        single package entry is held as a Python dict at a time. Unlike
+        ``from_json``, unknown top-level keys are not reported.
+
+        Requires ``ijson`` (``pip install pyodide-lock[ijson]``).
+        """
+        import ijson
+
+        data: dict[str, Any] = {}
+        with path.open("rb") as fh:
+            for info in ijson.items(fh, "info"):
+                data["info"] = info
+                break
+            fh.seek(0)
+            data["packages"] = {
+                name: PackageSpec.model_validate(package)
+                for name, package in ijson.kvitems(fh, "packages")
+            }
+            if not data["packages"]:
+                # kvitems yields nothing for both an empty and a missing
+                # "packages" object, leave a missing one for pydantic to report
+                fh.seek(0)
+                if not any(
+                    prefix == "" and event == "map_key" and value == "packages"
+                    for prefix, event, value in ijson.parse(fh)
+                ):
+                    del data["packages"]
+        return cls.model_validate(data)
+
+    def to_json(
+        self, path: Path, indent: int | None = None, sort_keys: bool = True
+    ) -> None:
+        """Write the lock spec to a json file.
+
+        With ``sort_keys=False`` the model is serialized directly by
+        pydantic-core, keeping the field and package order. Sorting keys is
+        not supported by ``model_dump_json``, so by default the model is
+        dumped to a dict and serialized with the stdlib ``json`` module.
+        With ``indent=2`` ``orjson`` is used instead when it is installed,
+        unless the lock spec contains non-ASCII characters, which ``json``
+        escapes and ``orjson`` does not. Both produce the same output.
+
+        The file is written in text mode, so line breaks are the platform's
+        (CRLF on Windows) as in previous releases.
+        """
+        if not sort_keys:
+            path.write_text(self.model_dump_json(indent=indent), encoding="utf-8")
+            return
+
+        model_dict = self.model_dump()
+        if orjson is not None and indent == 2:
+            json_bytes = orjson.dumps(
+                model_dict, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2
+            )
+            if json_bytes.isascii():
+                path.write_text(json_bytes.decode("ascii"), encoding="utf-8")
+                return
+
+        json_str = json.dumps(model_dict, indent=indent, sort_keys=True)
+        path.write_text(json_str, encoding="utf-8")
 
     def check_wheel_filenames(self) -> None:
         """Check that the package name and version are consistent in wheel filenames"""
-        from packaging.utils import (
-            canonicalize_name,
-            canonicalize_version,
-            parse_wheel_filename,
-        )
+        if parse_wheel_filename is None:  # pragma: no cover
+            raise ImportError(
+                "check_wheel_filenames requires packaging, "
+                "install it with `pip install pyodide-lock[wheel]`"
+            )
 
-        errors: dict[str, list[str]] = {}
+        errors: defaultdict[str, list[str]] = defaultdict(list)
         for name, spec in self.packages.items():
             if not spec.file_name.endswith(".whl"):
                 continue
-            name_in_wheel, ver, _, _ = parse_wheel_filename(spec.file_name)
-            if canonicalize_name(name_in_wheel) != canonicalize_name(spec.name):
-                errors.setdefault(name, []).append(
+            name_in_wheel, ver, _, _ = _parse_wheel_filename(spec.file_name)
+            if _canonicalize_name(name_in_wheel) != _canonicalize_name(spec.name):
+                errors[name].append(
                     f"Package name in wheel filename {name_in_wheel!r} "
                     f"does not match {spec.name!r}"
                 )
-            if canonicalize_version(ver) != canonicalize_version(spec.version):
-                errors.setdefault(name, []).append(
-                    f"Version in the wheel filename {canonicalize_version(ver)!r} "
-                    f"does not match package version "
-                    f"{canonicalize_version(spec.version)!r}"
+            wheel_version = _canonicalize_version(ver)
+            package_version = _canonicalize_version(spec.version)
+            if wheel_version != package_version:
+                errors[name].append(
+                    f"Version in the wheel filename {wheel_version!r} "
+                    f"does not match package version {package_version!r}"
                 )
         if errors:
             error_msg = "check_wheel_filenames failed:\n"
@@ -1,21 +1,51 @@
 import hashlib
 import logging
+import mmap
+import os
 import re
 import sys
 import zipfile
-from collections import deque
-from functools import cache
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from email.parser import HeaderParser
+from email.policy import compat32
+from functools import partial
 from pathlib import Path
-from typing import TYPE_CHECKING  #
-
-from .spec import InfoSpec, PackageSpec, PyodideLockSpec
+from typing import TYPE_CHECKING, cast
+
+from .spec import (
+    InfoSpec,
+    PackageSpec,
+    PyodideLockSpec,
+    _canonicalize_name,
+    _parse_wheel_filename,
+)
+
+try:
+    from packaging.markers import default_environment
+    from packaging.requirements import Requirement
+    from packaging.utils import InvalidWheelFilename
+    from packaging.version import InvalidVersion
+    from packaging.version import parse as version_parse
+except ImportError:  # pragma: no cover
+    # packaging is only needed to add wheels to a lockfile (the "wheel" extra)
+    default_environment = version_parse = None  # type: ignore[assignment]
+    Requirement = InvalidWheelFilename = InvalidVersion = None  # type: ignore[assignment,misc]
 
 if TYPE_CHECKING:
-    from packaging.requirements import Requirement
-    from pkginfo import Distribution
+    from packaging.markers import Marker
 
 logger = logging.getLogger(__name__)
 
+#: splits a lockfile platform such as ``emscripten_3_1_45`` into name and release
+_PLATFORM_RE = re.compile(r"([^_]+)_(.*)")
+
+#: read size used when hashing files that cannot be memory mapped
+_HASH_CHUNK_SIZE = 1 << 20
+
+#: line breaks of folded header values, see RFC 5322 section 2.2.3
+_FOLDING_RE = re.compile(r"\r?\n(?=[ \t])")
+
 #: the last-observed state of ``packaging.markers.default_environment`` in ``pyodide``
 _PYODIDE_MARKER_ENV = {
     "implementation_name": "cpython",
@@ -43,45 +73,51 @@ def parse_top_level_import_name(whlfile: Path) -> list[str] | None:
     if not whlfile.name.endswith(".whl"):
         raise RuntimeError(f"{whlfile} is not a wheel file.")
 
-    whlzip = zipfile.Path(whlfile)
+    with zipfile.ZipFile(whlfile) as whlzip:
+        return _top_level_import_names(whlfile, whlzip.namelist())
+
 
+def _top_level_import_names(whlfile: Path, names: list[str]) -> list[str] | None:
+    """Find the top-level import names from the member names of a wheel."""
     # We will find top level imports by
     # 1) a python file on a top-level directory
     # 2) a sub directory with __init__.py
     # following: https://github.com/pypa/setuptools/blob/d680efc8b4cd9aa388d07d3e298b870d26e9e04b/setuptools/discovery.py#L122
     # - n.b. this is more reliable than using top-level.txt which is
     # sometimes broken
-    top_level_imports = []
-    for subdir in whlzip.iterdir():
-        if subdir.is_file() and subdir.name.endswith(".py"):
-            top_level_imports.append(subdir.name[:-3])
-        elif subdir.is_dir() and _valid_package_name(subdir.name):
-            if _has_python_file(subdir):
-                top_level_imports.append(subdir.name)
+    #
+    # Both are derived from a single pass over the archive member names,
+    # instead of walking the directory tree of the zip file.
+    top_level_modules = []
+    # top-level directory -> whether it contains a python file
+    top_level_dirs: dict[str, bool] = {}
+    for name in names:
+        *dirs, filename = name.split("/")
+        if not dirs:
+            if filename.endswith(".py"):
+                top_level_modules.append(filename[:-3])
+        elif _valid_package_name(dirs[0]) and not top_level_dirs.get(dirs[0]):
+            top_level_dirs[dirs[0]] = filename.endswith(".py") and all(
+                _valid_package_name(d) for d in dirs[1:]
+            )
+
+    top_level_imports = top_level_modules + [
+        dirname for dirname, has_python in top_level_dirs.items() if has_python
+    ]
     if not top_level_imports:
         logger.warning(
-            f"WARNING: failed to parse top level import name from {whlfile}."
+            "WARNING: failed to parse top level import name from %s.", whlfile
         )
         return None
 
     return top_level_imports
 
 
-def _valid_package_name(dirname: str) -> bool:
-    return all([invalid_chr not in dirname for invalid_chr in ".- "])
-
+_INVALID_PACKAGE_CHARS = frozenset(".- ")
 
-def _has_python_file(subdir: zipfile.Path) -> bool:
-    queue = deque([subdir])
-    while queue:
-        nested_subdir = queue.pop()
-        for subfile in nested_subdir.iterdir():
-            if subfile.is_file() and subfile.name.endswith(".py"):
-                return True
-            elif subfile.is_dir() and _valid_package_name(subfile.name):
-                queue.append(subfile)
 
-    return False
+def _valid_package_name(dirname: str) -> bool:
+    return _INVALID_PACKAGE_CHARS.isdisjoint(dirname)
 
 
 def _generate_package_hash(full_path: Path) -> str:
@@ -95,10 +131,25 @@ def _generate_package_hash(full_path: Path) -> str:
     >>> _generate_package_hash(input_path)
     '2c26b46b68ffc68ff99b453c1d30413413422d706483bfa0f98a5e886266e7ae'
     """
-    sha256_hash = hashlib.sha256()
     with open(full_path, "rb") as f:
-        while chunk := f.read(4096):
-            sha256_hash.update(chunk)
+        try:
+            # hash the whole file in a single call straight from the page
+            # cache, without copying it into Python buffers
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return hashlib.sha256(mm).hexdigest()
+        except (OSError, ValueError):
+            # empty files (and some file systems) cannot be memory mapped
+            pass
+
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        # read into a single reusable buffer, in large chunks to keep the
+        # number of Python level iterations low
+        sha256_hash = hashlib.sha256()
+        buffer = memoryview(bytearray(_HASH_CHUNK_SIZE))
+        while size := f.readinto(buffer):
+            sha256_hash.update(buffer[:size])
     return sha256_hash.hexdigest()
 
 
@@ -110,15 +161,12 @@ def _get_marker_environment(
     inside pyodide it returns the current marker environment.
     """
     if "pyodide" in sys.modules:
-        from packaging.markers import default_environment
-
-        return default_environment()
+        # a TypedDict of str values in packaging >= 22
+        return cast(dict[str, str], default_environment())
     else:
         marker_env = _PYODIDE_MARKER_ENV.copy()
-        from packaging.version import parse as version_parse
-
         target_python = version_parse(python)
-        match = re.match("([^_]+)_(.*)", platform)
+        match = _PLATFORM_RE.match(platform)
         if match is not None:
             marker_env["sys_platform"] = match.group(1)
             marker_env["platform_release"] = match.group(2)
@@ -129,23 +177,50 @@ def _get_marker_environment(
         return marker_env
 
 
-@cache
-def _wheel_metadata(path: Path) -> "Distribution":
-    """Cached wheel metadata to save opening the file multiple times"""
-    from pkginfo import get_metadata
+def _wheel_metadata(whl: zipfile.ZipFile, names: list[str]) -> Message | None:
+    """Parse the METADATA file of an open wheel, or return None if there is none
 
-    metadata = get_metadata(str(path))
-    return metadata
+    ``names`` is the wheel's ``namelist()``, passed in so it is only built once.
+    """
+    for name in names:
+        dist_info, _, filename = name.partition("/")
+        if filename == "METADATA" and dist_info.endswith(".dist-info"):
+            # core metadata is UTF-8; only the headers are needed, the body
+            # is the long description
+            return HeaderParser(policy=compat32).parsestr(
+                whl.read(name).decode("utf-8")
+            )
+    return None
 
 
-def _wheel_depends(metadata: "Distribution") -> list["Requirement"]:
-    """Get distribution dependencies from wheel metadata."""
-    from packaging.requirements import Requirement
+def _unfold(value: str) -> str:
+    """Unfold a header value that was split over several lines"""
+    return _FOLDING_RE.sub("", value)
+
+
+#: marker evaluation results, keyed by marker and marker environment
+_MarkerCache = dict[tuple["Marker", frozenset[tuple[str, str]]], bool]
 
+
+def _evaluate_marker(
+    marker: "Marker",
+    environment: frozenset[tuple[str, str]],
+    marker_cache: _MarkerCache,
+) -> bool:
+    """Cached marker evaluation, as many requirements share the same markers"""
+    key = (marker, environment)
+    result = marker_cache.get(key)
+    if result is None:
+        result = marker_cache[key] = marker.evaluate(dict(environment))
+    return result
+
+
+def _wheel_depends(metadata: Message) -> list["Requirement"]:
+    """Get distribution dependencies from wheel metadata."""
     depends: list[Requirement] = []
 
-    for dep_str in metadata.requires_dist:
-        req = Requirement(dep_str)
+    for dep_str in metadata.get_all("Requires-Dist", []):
+        req = Requirement(_unfold(dep_str))
         depends.append(req)
 
     return depends
@@ -161,6 +236,12 @@ def add_wheels_to_spec(
     """Add a list of wheel files to this pyodide-lock.json and return a
     new PyodideLockSpec
 
+    The input ``lock_spec`` is not modified, but the returned spec shares its
+    ``info`` and existing ``PackageSpec`` objects with it. To modify one of
+    these in the returned spec without affecting ``lock_spec``, replace it
+    with a copy first, e.g.
+    ``new_spec.packages[name] = new_spec.packages[name].model_copy(deep=True)``.
+
     Parameters:
     wheel_files : list[Path]
          A list of wheel files to import.
@@ -179,7 +260,9 @@ def add_wheels_to_spec(
         not 100% reliable, because it ignores any extras and does not do any
         sub-dependency or version resolution.
     """
-    new_spec = lock_spec.model_copy(deep=True)
+    # existing packages are never modified here, so only the packages dict
+    # itself is copied; new PackageSpec objects are added under new keys
+    new_spec = lock_spec.model_copy(update={"packages": {**lock_spec.packages}})
     if not wheel_files:
         return new_spec
     wheel_files = [f.resolve() for f in wheel_files]
@@ -187,14 +270,28 @@ def add_wheels_to_spec(
         base_path = wheel_files[0].parent
     else:
         base_path = base_path.resolve()
-
-    new_packages = {}
-    for f in wheel_files:
-        spec = package_spec_from_wheel(f, info=lock_spec.info)
-
-        new_packages[spec.name] = spec
-
-    _fix_new_package_deps(lock_spec, new_packages, ignore_missing_dependencies)
+    # add the new packages in a deterministic order, whatever order the
+    # wheels were passed in
+    wheel_files = sorted(wheel_files, key=lambda f: f.name)
+
+    inspect_wheel = partial(_inspect_wheel, info=lock_spec.info)
+    if sys.platform == "emscripten" or len(wheel_files) == 1:
+        # threads cannot be started inside pyodide, and a pool is of no use
+        # for a single wheel
+        inspected = list(map(inspect_wheel, wheel_files))
+    else:
+        # hashlib and zlib release the GIL while hashing / reading the
+        # wheels, so inspect the wheels in parallel, one core each
+        max_workers = min(os.cpu_count() or 1, len(wheel_files))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            inspected = list(executor.map(inspect_wheel, wheel_files))
+    new_packages = {spec.name: spec for spec, _ in inspected}
+    # keep the parsed metadata, so the wheels are only read once
+    new_metadata = {spec.name: metadata for spec, metadata in inspected}
+
+    _fix_new_package_deps(
+        lock_spec, new_packages, new_metadata, ignore_missing_dependencies
+    )
     _set_package_paths(new_packages, base_path, base_url)
     new_spec.packages |= new_packages
     return new_spec
@@ -203,34 +300,52 @@ def add_wheels_to_spec(
 def _fix_new_package_deps(
     lock_spec: PyodideLockSpec,
     new_packages: dict[str, PackageSpec],
+    new_metadata: dict[str, Message],
     ignore_missing_dependencies: bool,
 ):
     # now fix up the dependencies for each of our new packages
     # n.b. this assumes existing packages have correct dependencies,
     # which is probably a good assumption.
-    from packaging.utils import canonicalize_name
-
-    requirements_with_extras = []
-    marker_environment = _get_marker_environment(**lock_spec.info.model_dump())
+    # (package name, extra) pairs whose dependencies must be added to the package
+    pending_extras: list[tuple[str, str]] = []
+    known_packages = frozenset(new_packages) | frozenset(lock_spec.packages)
+    # parsed requirements of each new package with their canonicalized names,
+    # reused when resolving extras
+    package_requirements: dict[str, list[tuple[str, Requirement]]] = {}
+    # the marker environment is the same for every requirement, compute it once
+    info = lock_spec.info
+    marker_environment = _get_marker_environment(
+        platform=info.platform,
+        version=info.version,
+        arch=info.arch,
+        python=info.python,
+        abi_version=info.abi_version,
+    )
+    marker_environment_items = frozenset(marker_environment.items())
+    # only kept for this call, so markers are not held on to afterwards
+    marker_cache: _MarkerCache = {}
     for package in new_packages.values():
         # add any requirements to the list of packages
         our_depends = []
-        wheel_file = package.file_name
-        metadata = _wheel_metadata(wheel_file)
-        requirements = _wheel_depends(metadata)
-        for r in requirements:
+        requirements = [
+            (_canonicalize_name(r.name), r)
+            for r in _wheel_depends(new_metadata[package.name])
+        ]
+        package_requirements[package.name] = requirements
+        for req_name, r in requirements:
             req_marker = r.marker
-            req_name = canonicalize_name(r.name)
             if req_marker is not None:
-                if not req_marker.evaluate(marker_environment):
+                if not _evaluate_marker(
+                    req_marker, marker_environment_items, marker_cache
+                ):
                     # not used in pyodide / emscripten
                     # or optional requirement
                     continue
             if r.extras:
                 # this requirement has some extras, we need to check
                 # that the required package depends on these extras also.
-                requirements_with_extras.append(r)
-            if req_name in new_packages or req_name in lock_spec.packages:
+                pending_extras.extend((req_name, extra) for extra in r.extras)
+            if req_name in known_packages:
                 our_depends.append(req_name)
             elif ignore_missing_dependencies:
                 our_depends.append(req_name)
@@ -239,11 +354,25 @@ def _fix_new_package_deps(
                     f"Requirement {req_name} from {r} is not in this distribution."
                 )
         package.depends = our_depends
-    while len(requirements_with_extras) != 0:
-        extra_req = requirements_with_extras.pop()
-        requirements_with_extras.extend(
+    # extras can depend on other extras (possibly cyclically), so walk them
+    # as a graph, visiting each (package, extra) pair at most once
+    visited_extras: set[tuple[str, str]] = set()
+    while pending_extras:
+        package_extra = pending_extras.pop()
+        if package_extra in visited_extras:
+            continue
+        visited_extras.add(package_extra)
+        package_name, extra = package_extra
+        pending_extras.extend(
             _fix_extra_dep(
-                lock_spec, extra_req, new_packages, ignore_missing_dependencies
+                marker_environment,
+                package_name,
+                extra,
+                new_packages,
+                package_requirements,
+                known_packages,
+                ignore_missing_dependencies,
+                marker_cache,
             )
         )
 
@@ -252,48 +381,48 @@ def _fix_new_package_deps(
 # required package includes the dependencies for that extra.
 # This is because extras aren't supported in pyodide-lock
 def _fix_extra_dep(
-    lock_spec: PyodideLockSpec,
-    extra_req: "Requirement",
+    marker_environment: dict[str, str],
+    package_name: str,
+    extra: str,
     new_packages: dict[str, PackageSpec],
+    package_requirements: dict[str, list[tuple[str, "Requirement"]]],
+    known_packages: frozenset[str],
     ignore_missing_dependencies: bool,
-) -> list["Requirement"]:
-    from packaging.utils import canonicalize_name
-
-    requirements_with_extras = []
+    marker_cache: _MarkerCache,
+) -> list[tuple[str, str]]:
+    """Add the dependencies of ``package_name[extra]`` to the package and
+    return the (package, extra) pairs these dependencies require in turn."""
+    extras_to_fix: list[tuple[str, str]] = []
 
-    marker_environment = _get_marker_environment(**lock_spec.info.model_dump())
-    extra_package_name = canonicalize_name(extra_req.name)
-    if extra_package_name not in new_packages:
+    if package_name not in new_packages:
         return []
-    package = new_packages[extra_package_name]
+    package = new_packages[package_name]
     our_depends = package.depends
-    wheel_file = package.file_name
-    metadata = _wheel_metadata(wheel_file)
-    requirements = _wheel_depends(metadata)
-    for extra in extra_req.extras:
-        this_marker_env = marker_environment.copy()
-        this_marker_env["extra"] = extra
-
-        for r in requirements:
-            req_marker = r.marker
-            req_name = canonicalize_name(r.name)
-            if req_name not in our_depends:
-                if req_marker is None:
-                    # no marker - this will have been processed above
-                    continue
-                if req_marker.evaluate(this_marker_env):
-                    if req_name in new_packages or req_name in lock_spec.packages:
-                        our_depends.append(req_name)
-                        if r.extras:
-                            requirements_with_extras.append(r)
-                    elif ignore_missing_dependencies:
-                        our_depends.append(req_name)
-                    else:
-                        raise RuntimeError(
-                            f"Requirement {req_name} is not in this distribution."
-                        )
+    # set mirror of our_depends for constant time membership checks
+    our_depends_set = set(our_depends)
+    requirements = package_requirements[package_name]
+    this_marker_env = frozenset({**marker_environment, "extra": extra}.items())
+
+    for req_name, r in requirements:
+        req_marker = r.marker
+        if req_name not in our_depends_set:
+            if req_marker is None:
+                # no marker - this will have been processed above
+                continue
+            if _evaluate_marker(req_marker, this_marker_env, marker_cache):
+                if req_name in known_packages:
+                    our_depends.append(req_name)
+                    our_depends_set.add(req_name)
+                    extras_to_fix.extend((req_name, e) for e in r.extras)
+                elif ignore_missing_dependencies:
+                    our_depends.append(req_name)
+                    our_depends_set.add(req_name)
+                else:
+                    raise RuntimeError(
+                        f"Requirement {req_name} is not in this distribution."
+                    )
     package.depends = our_depends
-    return requirements_with_extras
+    return extras_to_fix
 
 
 def _set_package_paths(
@@ -306,24 +435,19 @@ def _set_package_paths(
 
 
 def _check_wheel_compatible(path: Path, info: InfoSpec) -> None:
-    from packaging.utils import (
-        InvalidWheelFilename,
-        parse_wheel_filename,
-    )
-    from packaging.version import InvalidVersion
-    from packaging.version import parse as version_parse
-
     target_python = version_parse(info.python)
     target_platform = info.platform + "_" + info.arch
     try:
-        (name, version, build_number, tags) = parse_wheel_filename(str(path.name))
+        # shares its cache with PyodideLockSpec.check_wheel_filenames
+        name, version, build_number, tags = _parse_wheel_filename(path.name)
     except (InvalidWheelFilename, InvalidVersion) as e:
         raise RuntimeError(f"Wheel filename {path.name} is not valid") from e
     python_binary_abi = f"cp{target_python.major}{target_python.minor}"
-    tags = list(tags)
     abi3_compat = {
         f"cp{target_python.major}{minor}" for minor in range(target_python.minor + 1)
     }
+    # pure python wheels: py3 or py3X with X <= target minor version
+    pure_python_interpreter = re.compile(rf"py{target_python.major}(\d*)$")
 
     tag_match = False
     for t in tags:
@@ -337,11 +461,13 @@ def _check_wheel_compatible(path: Path, info: InfoSpec) -> None:
         elif t.abi == "abi3" and t.interpreter in abi3_compat:
             tag_match = True
         elif t.abi == "none" and t.platform == "any":
-            match = re.match(rf"py{target_python.major}(\d*)", t.interpreter)
+            match = pure_python_interpreter.match(t.interpreter)
             if match:
                 subver = match.group(1)
                 if len(subver) == 0 or int(subver) <= target_python.minor:
                     tag_match = True
+        if tag_match:
+            break
     if not tag_match:
         raise RuntimeError(
             f"Package tags for {path} don't match Python version in lockfile:"
@@ -360,32 +486,41 @@ def package_spec_from_wheel(path: Path, info: InfoSpec) -> PackageSpec:
 
         This is called by add_wheels_to_spec
     """
-    from packaging.utils import (
-        canonicalize_name,
-    )
+    return _inspect_wheel(path.absolute(), info)[0]
+
 
-    path = path.absolute()
+def _inspect_wheel(path: Path, info: InfoSpec) -> tuple[PackageSpec, Message]:
+    """Build a draft package spec from an on-disk wheel, and return it
+    together with the parsed wheel metadata. ``path`` must be absolute."""
     # throw an error if this is an incompatible wheel
 
     _check_wheel_compatible(path, info)
-    metadata = _wheel_metadata(path)
+    # read the metadata and import names from a single open of the archive
+    with zipfile.ZipFile(path) as whl:
+        names = whl.namelist()
+        metadata = _wheel_metadata(whl, names)
+        imports = _top_level_import_names(path, names)
 
-    if not metadata:
+    if metadata is None or metadata["Name"] is None or metadata["Version"] is None:
         raise RuntimeError(f"Could not parse wheel metadata from {path.name}")
 
     # returns a draft PackageSpec with:
     # 1) absolute path to wheel,
     # 2) empty dependency list
-    return PackageSpec(
-        name=canonicalize_name(metadata.name),
-        version=metadata.version,
+    # all fields are built here with the right types, so skip validation
+    spec = PackageSpec.model_construct(
+        name=_canonicalize_name(metadata["Name"]),
+        version=metadata["Version"],
         file_name=str(path),
         sha256=_generate_package_hash(path),
         package_type="package",
         install_dir="site",
-        imports=parse_top_level_import_name(path),
+        imports=imports or [],
         depends=[],
+        unvendored_tests=False,
+        shared_library=False,
     )
+    return spec, metadata
 
 
 def update_package_sha256(spec: PackageSpec, path: Path) -> "PackageSpec":
@@ -1,10 +1,11 @@
+import hashlib
 import json
-from copy import deepcopy
-from dataclasses import asdict, dataclass
+import re
+import zipfile
+from base64 import urlsafe_b64encode
+from dataclasses import dataclass
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
-import build
 import pytest
 from packaging.utils import canonicalize_name
 
@@ -34,8 +35,11 @@ LOCK_EXAMPLE = {
     },
 }
 
+# fresh copies of the example are parsed from json, which is cheaper than deepcopy
+_LOCK_EXAMPLE_JSON = json.dumps(LOCK_EXAMPLE)
+
 # marker environment for testing
-_ENV = _get_marker_environment(**LOCK_EXAMPLE["info"])  # type:ignore[arg-type]
+_ENV = _get_marker_environment(**LOCK_EXAMPLE["info"])  # type: ignore[arg-type]
 # marker environment for testing, filtered only to numerical values
 _ENV_NUM = {k: v for k, v in _ENV.items() if v[0] in "0123456789"}
 
@@ -71,15 +75,21 @@ def marker_examples_not_needed():
 
 @pytest.fixture
 def example_lock_data():
-    return deepcopy(LOCK_EXAMPLE)
+    return json.loads(_LOCK_EXAMPLE_JSON)
 
 
 @pytest.fixture
 def example_lock_spec():
-    return PyodideLockSpec(**deepcopy(LOCK_EXAMPLE))
+    return PyodideLockSpec.model_validate_json(_LOCK_EXAMPLE_JSON)
+
+
+def _record_hash(data: bytes) -> str:
+    digest = hashlib.sha256(data).digest()
+    return "sha256=" + urlsafe_b64encode(digest).rstrip(b"=").decode()
 
 
-# build a wheel
+# write a minimal pure python wheel; this is much faster than building it
+# with a PEP 517 backend, which sets up an isolated environment per wheel
 def make_test_wheel(
     dir: Path,
     package_name: str,
@@ -87,49 +97,54 @@ def make_test_wheel(
     optional_deps: dict[str, list[str]] | None = None,
     modules: list[str] | None = None,
 ):
-    package_dir = dir / package_name
-    package_dir.mkdir()
     if not modules:
         modules = [canonicalize_name(package_name).replace("-", "_")]
-    for m in modules:
-        (package_dir / f"{m}.py").write_text("")
-    toml = package_dir / "pyproject.toml"
-    if deps is None:
-        deps = []
-
-    all_deps = json.dumps(deps)
-    if optional_deps:
-        all_optional_deps = "[project.optional-dependencies]\n" + "\n".join(
-            [x + "=" + json.dumps(optional_deps[x]) for x in optional_deps.keys()]
-        )
-    else:
-        all_optional_deps = ""
-    toml_text = f"""
-[build-system]
-requires = ["setuptools"]
-build-backend = "setuptools.build_meta"
-
-[project]
-name = "{package_name}"
-description = "{package_name} example package"
-version = "1.0.0"
-authors = [
-    {{ name = "Bob Jones", email = "bobjones@nowhere.nowhere" }}
-]
-dependencies = {
-    all_deps
-}
+    version = "1.0.0"
+    # like setuptools, only escape the separators and keep the case
+    dist_name = re.sub(r"[-_.]+", "_", package_name)
+    dist_info = f"{dist_name}-{version}.dist-info"
+
+    metadata = [
+        "Metadata-Version: 2.1",
+        f"Name: {package_name}",
+        f"Version: {version}",
+        f"Summary: {package_name} example package",
+    ]
+    metadata += [f"Requires-Dist: {dep}" for dep in deps or []]
+    for extra, extra_deps in (optional_deps or {}).items():
+        metadata.append(f"Provides-Extra: {extra}")
+        for dep in extra_deps:
+            requirement, _, marker = dep.partition(";")
+            extra_marker = f'extra == "{canonicalize_name(extra)}"'
+            if marker.strip():
+                extra_marker = f"({marker.strip()}) and {extra_marker}"
+            metadata.append(f"Requires-Dist: {requirement.strip()}; {extra_marker}")
+    wheel = [
+        "Wheel-Version: 1.0",
+        "Generator: pyodide-lock tests",
+        "Root-Is-Purelib: true",
+        "Tag: py3-none-any",
+    ]
 
-{ all_optional_deps }
+    files = {f"{m}.py": b"" for m in modules}
+    files[f"{dist_info}/METADATA"] = "\n".join(metadata + [""]).encode()
+    files[f"{dist_info}/WHEEL"] = "\n".join(wheel + [""]).encode()
+    record = [
+        f"{name},{_record_hash(data)},{len(data)}" for name, data in files.items()
+    ]
+    record.append(f"{dist_info}/RECORD,,")
+    files[f"{dist_info}/RECORD"] = "\n".join(record + [""]).encode()
 
-"""
-    toml.write_text(toml_text)
-    builder = build.ProjectBuilder(package_dir)
-    return Path(builder.build("wheel", dir / "dist"))
+    wheel_path = dir / "dist" / f"{dist_name}-{version}-py3-none-any.whl"
+    wheel_path.parent.mkdir(exist_ok=True)
+    with zipfile.ZipFile(wheel_path, "w", zipfile.ZIP_DEFLATED) as whl:
+        for name, data in files.items():
+            whl.writestr(name, data)
+    return wheel_path
 
 
-@pytest.fixture(scope="module")
-def test_wheel_list():
+@pytest.fixture(scope="session")
+def test_wheel_list(tmp_path_factory):
     @dataclass
     class TestWheel:
         package_name: str
@@ -151,12 +166,24 @@ def test_wheel_list():
             package_name="markers_not_needed_test", deps=MARKER_EXAMPLES_NOT_NEEDED
         ),
         TestWheel(package_name="markers_needed_test", deps=MARKER_EXAMPLES_NEEDED),
+        TestWheel(package_name="cycle-a", optional_deps={"b": ["cycle-b[a]"]}),
+        TestWheel(package_name="cycle-b", optional_deps={"a": ["cycle-a[b]"]}),
+        TestWheel(package_name="needs-cycle", deps=["cycle-a[b]"]),
+        TestWheel(
+            package_name="non-ascii",
+            deps=[
+                # a folded header value
+                "py-one ;\n  python_version >= '3'",
+                "needs-one @ file:///home/j\u00f6rg/needs_one-1.0.0-py3-none-any.whl",
+                "missing; extra == 'caf\u00e9'",
+            ],
+        ),
     ]
 
-    with TemporaryDirectory() as tmpdir:
-        path_temp = Path(tmpdir)
-        path_temp.mkdir(exist_ok=True)
-        all_wheels = []
-        for wheel_data in test_wheels:
-            all_wheels.append(make_test_wheel(path_temp, **asdict(wheel_data)))
-        yield all_wheels
+    # the wheels are only read by the tests, so they are written once per session
+    path_temp = tmp_path_factory.mktemp("wheels")
+    return [
+        # vars() rather than asdict(), which deep copies every field
+        make_test_wheel(path_temp, **vars(wheel_data))
+        for wheel_data in test_wheels
+    ]
@@ -0,0 +1,32 @@
+from typer.testing import CliRunner
+
+from pyodide_lock import PyodideLockSpec
+from pyodide_lock.cli import main
+
+
+def test_add_wheels_cli(tmp_path, test_wheel_list, example_lock_spec):
+    input_path = tmp_path / "pyodide-lock.json"
+    output_path = tmp_path / "pyodide-lock-new.json"
+    example_lock_spec.to_json(input_path)
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "--input",
+            str(input_path),
+            "--output",
+            str(output_path),
+            *map(str, test_wheel_list[0:3]),
+        ],
+        # let errors propagate with their own traceback
+        catch_exceptions=False,
+    )
+    assert result.exit_code == 0, result.output
+
+    new_spec = PyodideLockSpec.from_json(output_path)
+    assert new_spec.packages["needs-one"].depends == ["py-one"]
+    assert set(new_spec.packages) == set(example_lock_spec.packages) | {
+        "py-one",
+        "needs-one",
+        "needs-one-opt",
+    }
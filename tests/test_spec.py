@@ -1,9 +1,11 @@
 import gzip
-import shutil
+import json
 from copy import deepcopy
+from functools import cache
 from pathlib import Path
 
 import pytest
+from pydantic import ValidationError
 
 from pyodide_lock import PyodideLockSpec
 from pyodide_lock.spec import InfoSpec, PackageSpec
@@ -12,15 +14,18 @@ from pyodide_lock.utils import update_package_sha256
 DATA_DIR = Path(__file__).parent / "data"
 
 
+@cache
+def _historic_lockfile(pyodide_version: str) -> bytes:
+    """The decompressed lockfile of a past pyodide release, read only once."""
+    source_path = DATA_DIR / f"pyodide-lock-{pyodide_version}.json.gz"
+    return gzip.decompress(source_path.read_bytes())
+
+
 @pytest.mark.parametrize("pyodide_version", ["0.22.1", "0.23.3"])
 def test_lock_spec_parsing(pyodide_version, tmp_path):
-    source_path = DATA_DIR / f"pyodide-lock-{pyodide_version}.json.gz"
     target_path = tmp_path / "pyodide-lock.json"
     target2_path = tmp_path / "pyodide-lock2.json"
-
-    with gzip.open(source_path) as fh_in:
-        with target_path.open("wb") as fh_out:
-            shutil.copyfileobj(fh_in, fh_out)
+    target_path.write_bytes(_historic_lockfile(pyodide_version))
 
     spec = PyodideLockSpec.from_json(target_path)
     spec.to_json(target2_path, indent=2)
@@ -35,6 +40,38 @@ def test_lock_spec_parsing(pyodide_version, tmp_path):
         assert pkg1.model_dump() == pkg2.model_dump()
 
 
+@pytest.mark.parametrize("pyodide_version", ["0.22.1", "0.23.3"])
+def test_lock_spec_streaming(pyodide_version, tmp_path):
+    pytest.importorskip("ijson")
+    target_path = tmp_path / "pyodide-lock.json"
+    target_path.write_bytes(_historic_lockfile(pyodide_version))
+
+    spec = PyodideLockSpec.from_json_streaming(target_path)
+    assert spec == PyodideLockSpec.from_json(target_path)
+
+
+@pytest.mark.parametrize("missing_key", ["info", "packages"])
+def test_lock_spec_streaming_missing_key(missing_key, example_lock_data, tmp_path):
+    pytest.importorskip("ijson")
+    target_path = tmp_path / "pyodide-lock.json"
+    del example_lock_data[missing_key]
+    target_path.write_text(json.dumps(example_lock_data))
+
+    with pytest.raises(ValidationError, match=missing_key):
+        PyodideLockSpec.from_json(target_path)
+    with pytest.raises(ValidationError, match=missing_key):
+        PyodideLockSpec.from_json_streaming(target_path)
+
+
+@pytest.mark.parametrize("pyodide_version", ["0.22.1", "0.23.3"])
+def test_lock_spec_without_validation(pyodide_version, tmp_path):
+    target_path = tmp_path / "pyodide-lock.json"
+    target_path.write_bytes(_historic_lockfile(pyodide_version))
+
+    spec = PyodideLockSpec.from_json(target_path, validate=False)
+    assert spec == PyodideLockSpec.from_json(target_path)
+
+
 def test_check_wheel_filenames(example_lock_data):
     spec = PyodideLockSpec(**example_lock_data)
     spec.check_wheel_filenames()
@@ -75,6 +112,36 @@ def test_to_json_indent(tmp_path, example_lock_data):
     assert "\n" in target_path.read_text()
 
 
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("imports", [["numpy"], ["numpy", "caf\u00e9"]])
+def test_to_json_stdlib_fallback(
+    monkeypatch, tmp_path, example_lock_data, indent, imports
+):
+    pytest.importorskip("orjson")
+    example_lock_data["packages"]["numpy"]["imports"] = imports  # type: ignore[index]
+    spec = PyodideLockSpec(**example_lock_data)
+
+    spec.to_json(tmp_path / "orjson.json", indent=indent)
+    monkeypatch.setattr("pyodide_lock.spec.orjson", None)
+    spec.to_json(tmp_path / "json.json", indent=indent)
+
+    assert (tmp_path / "orjson.json").read_bytes() == (
+        tmp_path / "json.json"
+    ).read_bytes()
+    assert PyodideLockSpec.from_json(tmp_path / "json.json") == spec
+
+
+def test_to_json_unsorted(tmp_path, example_lock_data):
+    target_path = tmp_path / "pyodide-lock.json"
+
+    spec = PyodideLockSpec(**example_lock_data)
+    spec.to_json(target_path, sort_keys=False)
+
+    assert "\n" not in target_path.read_text()
+    assert target_path.read_text().startswith('{"info":{"arch":"wasm32",')
+    assert PyodideLockSpec.from_json(target_path) == spec
+
+
 def test_update_sha256(monkeypatch, example_lock_data):
     monkeypatch.setattr("pyodide_lock.utils._generate_package_hash", lambda x: "abcd")
 
@@ -86,8 +153,6 @@ def test_update_sha256(monkeypatch, example_lock_data):
 
 
 def test_extra_config_forbidden(example_lock_data):
-    from pydantic import ValidationError
-
     info_data = deepcopy(example_lock_data["info"])
     package_data = deepcopy(
         example_lock_data["packages"]["numpy"]
@@ -1,8 +1,11 @@
+import hashlib
+import os
 import zipfile
 
 import pytest
 
 from pyodide_lock import parse_top_level_import_name
+from pyodide_lock.utils import _generate_package_hash
 
 
 @pytest.mark.parametrize(
@@ -26,6 +29,12 @@ from pyodide_lock import parse_top_level_import_name
             "content": "pass\n",
             "top_level": ["pkg_ruamel"],
         },
+        {
+            "name": "bad_nested_invalid-1.0.0-py3-none-any.whl",
+            "file": "pkg/not-a-package/module.py",
+            "content": "pass\n",
+            "top_level": None,
+        },
         {
             "name": "bad_no_python-1.0.0-py3-none-any.whl",
             "file": "no/python/README.md",
@@ -55,3 +64,36 @@ def test_not_wheel(tmp_path):
 
     with pytest.raises(RuntimeError, match="not a wheel"):
         parse_top_level_import_name(path)
+
+
+def _raise_os_error(*args, **kwargs):
+    raise OSError
+
+
+@pytest.mark.parametrize("use_file_digest", [True, False])
+@pytest.mark.parametrize("use_mmap", [True, False])
+# an empty file can not be memory mapped, the other one is larger than a
+# single read chunk
+@pytest.mark.parametrize("data", [b"", bytes(range(256)) * 5000])
+def test_generate_package_hash(monkeypatch, tmp_path, use_file_digest, use_mmap, data):
+    path = tmp_path / "pkg-1.0.0-py3-none-any.whl"
+    path.write_bytes(data)
+
+    if not use_file_digest:
+        # as on Python 3.10
+        monkeypatch.delattr("hashlib.file_digest", raising=False)
+    if not use_mmap:
+        monkeypatch.setattr("pyodide_lock.utils.mmap.mmap", _raise_os_error)
+    assert _generate_package_hash(path) == hashlib.sha256(data).hexdigest()
+
+
+def test_generate_package_hash_modified(tmp_path):
+    path = tmp_path / "pkg-1.0.0-py3-none-any.whl"
+    path.write_bytes(b"a" * 100)
+    stat = path.stat()
+    assert _generate_package_hash(path) == hashlib.sha256(b"a" * 100).hexdigest()
+
+    # same size and modification time, e.g. after `cp -p` or `rsync -t`
+    path.write_bytes(b"b" * 100)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert _generate_package_hash(path) == hashlib.sha256(b"b" * 100).hexdigest()
@@ -25,6 +25,15 @@ def test_add_one(test_wheel_list, example_lock_spec):
     assert "py-one" not in example_lock_spec.packages
 
 
+def test_add_wheels_serial(monkeypatch, test_wheel_list, example_lock_spec):
+    expected = add_wheels_to_spec(example_lock_spec, test_wheel_list[0:4])
+
+    # inside pyodide no threads can be started
+    monkeypatch.setattr("sys.platform", "emscripten")
+    monkeypatch.setattr("pyodide_lock.utils.ThreadPoolExecutor", None)
+    assert add_wheels_to_spec(example_lock_spec, test_wheel_list[0:4]) == expected
+
+
 def test_add_simple_deps(test_wheel_list, example_lock_spec):
     example_lock_spec = add_wheels_to_spec(example_lock_spec, test_wheel_list[0:3])
     # py_one, needs_one and needs_one_opt should get added
@@ -46,12 +55,27 @@ def test_add_deps_with_extras(test_wheel_list, example_lock_spec):
     assert example_lock_spec.packages["needs-one-opt"].depends == ["py-one"]
 
 
+def test_add_deps_with_cyclic_extras(test_wheel_list, example_lock_spec):
+    example_lock_spec = add_wheels_to_spec(example_lock_spec, test_wheel_list[7:10])
+    # cycle-a[b] pulls in cycle-b[a], which pulls in cycle-a[b] again
+    assert example_lock_spec.packages["needs-cycle"].depends == ["cycle-a"]
+    assert example_lock_spec.packages["cycle-a"].depends == ["cycle-b"]
+    assert example_lock_spec.packages["cycle-b"].depends == ["cycle-a"]
+
+
 def test_missing_dep(test_wheel_list, example_lock_spec):
     # this has a package with a missing dependency so should fail
     with pytest.raises(RuntimeError):
         example_lock_spec = add_wheels_to_spec(example_lock_spec, test_wheel_list[0:5])
 
 
+def test_add_non_ascii_metadata(test_wheel_list, example_lock_spec):
+    example_lock_spec = add_wheels_to_spec(
+        example_lock_spec, test_wheel_list[0:2] + test_wheel_list[10:11]
+    )
+    assert example_lock_spec.packages["non-ascii"].depends == ["py-one", "needs-one"]
+
+
 def test_url_rewriting(test_wheel_list, example_lock_spec):
     example_lock_spec = add_wheels_to_spec(
         example_lock_spec, test_wheel_list[0:3], base_url="http://www.nowhere.org/"